@@ -109,9 +109,22 @@ def df_match(reference, *args, **kwds):
 
         if "dropduplicates" in kwds and kwds['dropduplicates']:
             arg_matched = arg_matched.dropna(how='all')
-            g = arg_matched.groupby('merge_key')
-            min_dists = g.distance.apply(lambda x: x.abs().idxmin())
-            arg_matched = arg_matched.loc[min_dists]
+            if arg_matched.index.is_unique:
+                # keep the closest reference time stamp (the first one if
+                # equally close) for each matched element, sorted by
+                # merge_key like the groupby below but without a python
+                # function call per group
+                merge_key = arg_matched['merge_key'].values
+                order = np.lexsort((np.abs(arg_matched['distance'].values),
+                                    merge_key))
+                order = order[~np.isnan(merge_key[order])]
+                first = np.ones(order.size, dtype=bool)
+                first[1:] = merge_key[order][1:] != merge_key[order][:-1]
+                arg_matched = arg_matched.iloc[order[first]]
+            else:
+                g = arg_matched.groupby('merge_key')
+                min_dists = g.distance.apply(lambda x: x.abs().idxmin())
+                arg_matched = arg_matched.loc[min_dists]
 
         temporal_matched_args.append(
             arg_matched.drop(['merge_key', 'ref_index'], axis=1))
@@ -26,12 +26,19 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import hashlib
 import itertools
+import os
 import warnings
+from collections import OrderedDict
 
+import numpy as np
 import pandas as pd
 
+from pygeobase.io_base import GriddedBase
 from pygeobase.object_base import TS
+from pygeogrids.grids import BasicGrid
+from pygeogrids.grids import CellGrid
 
 
 class DataManager(object):
@@ -57,6 +64,9 @@ class DataManager(object):
                 If set to True the grid point index is used directly when
                 reading other, if False then lon, lat is used and a nearest
                 neighbour search is necessary.
+                If the class is a pygeobase GriddedBase reader the nearest
+                neighbours can be searched for several points at once,
+                see get_other_gpis.
                 default: False
             'use_lut': boolean, optional
                 If set to True the grid point index (obtained from a
@@ -76,6 +86,19 @@ class DataManager(object):
         if another method name than 'read_ts' should be used for reading the data
         then it can be specified here. If it is a dict then specify a
         function name for each dataset.
+    read_cache_size: int, optional
+        Number of recently read time series to keep in memory. If a time
+        series is requested again, e.g. because several reference grid
+        points have the same nearest neighbour, it is not read again.
+        The cached DataFrames are returned as they are, so they must not
+        be changed in place.
+        Default: 0, nothing is cached
+    lut_cache_path: string, optional
+        Directory in which the luts of datasets with use_lut are stored.
+        A lut is only calculated if it is not yet stored for the same
+        grids and lut_max_dist, so e.g. several workers of a distributed
+        validation can share it.
+        Default: None, the luts are always calculated
 
     Methods
     -------
@@ -92,7 +115,9 @@ class DataManager(object):
 
     def __init__(self, datasets, ref_name,
                  period=None,
-                 read_ts_names='read_ts'):
+                 read_ts_names='read_ts',
+                 read_cache_size=0,
+                 lut_cache_path=None):
         """
         Initialize parameters.
         """
@@ -114,6 +139,7 @@ class DataManager(object):
             self.reference_grid = None
 
         self.period = period
+        self.lut_cache_path = lut_cache_path
         self.luts = self.get_luts()
         if type(read_ts_names) is dict:
             self.read_ts_names = read_ts_names
@@ -123,6 +149,16 @@ class DataManager(object):
                 d[dataset] = read_ts_names
             self.read_ts_names = d
 
+        self.read_cache_size = read_cache_size
+        self._read_cache = OrderedDict()
+
+    def __getstate__(self):
+        # the read cache is local to each process and not sent along
+        # e.g. when the validation is distributed to several workers
+        state = self.__dict__.copy()
+        state['_read_cache'] = OrderedDict()
+        return state
+
     def _add_default_values(self):
         """
         Add defaults for args, kwargs, grids_compatible, use_lut and
@@ -152,14 +188,46 @@ class DataManager(object):
         luts = {}
         for other_name in self.other_name:
             if self.datasets[other_name]['use_lut']:
-                luts[other_name] = self.reference_grid.calc_lut(
+                luts[other_name] = self._calc_lut(
                     self.datasets[other_name]['class'].grid,
-                    max_dist=self.datasets[other_name]['lut_max_dist'])
+                    self.datasets[other_name]['lut_max_dist'])
             else:
                 luts[other_name] = None
 
         return luts
 
+    def _calc_lut(self, other_grid, max_dist):
+        """
+        Calculate the lut between the reference grid and other_grid or
+        load it from lut_cache_path if it was already stored there.
+        """
+        if self.lut_cache_path is None:
+            return self.reference_grid.calc_lut(other_grid, max_dist=max_dist)
+
+        sha = hashlib.sha1()
+        for grid in [self.reference_grid, other_grid]:
+            for arr in [grid.gpis, grid.arrlon, grid.arrlat, grid.subset]:
+                if arr is not None:
+                    sha.update(np.ascontiguousarray(arr).tobytes())
+                sha.update(b'|')
+        sha.update(repr(max_dist).encode())
+        fname = os.path.join(self.lut_cache_path,
+                             'lut_{}.npy'.format(sha.hexdigest()))
+
+        if os.path.exists(fname):
+            return np.load(fname)
+
+        lut = self.reference_grid.calc_lut(other_grid, max_dist=max_dist)
+        os.makedirs(self.lut_cache_path, exist_ok=True)
+        # write to a temporary file first so that other processes never
+        # load a partially written lut
+        tmp_fname = '{}.{}.tmp'.format(fname, os.getpid())
+        with open(tmp_fname, 'wb') as f:
+            np.save(f, lut)
+        os.replace(tmp_fname, fname)
+
+        return lut
+
     @property
     def ds_dict(self):
         ds_dict = {}
@@ -244,6 +312,33 @@ class DataManager(object):
         data_df : pandas.DataFrame or None
             Data DataFrame.
 
+        """
+        if self.read_cache_size <= 0:
+            return self._read_ds(name, *args)
+
+        key = (name, args)
+        try:
+            data_df = self._read_cache[key]
+            self._read_cache.move_to_end(key)
+            return data_df
+        except KeyError:
+            pass
+        except TypeError:
+            # arguments that can not be hashed are never cached
+            return self._read_ds(name, *args)
+
+        data_df = self._read_ds(name, *args)
+        self._read_cache[key] = data_df
+        while len(self._read_cache) > self.read_cache_size:
+            try:
+                self._read_cache.popitem(last=False)
+            except KeyError:
+                break
+        return data_df
+
+    def _read_ds(self, name, *args):
+        """
+        Read a dataset without using the read cache, see read_ds.
         """
         ds = self.datasets[name]
         args = list(args)
@@ -290,7 +385,53 @@ class DataManager(object):
         else:
             return data_df
 
-    def get_data(self, gpi, lon, lat):
+    def get_other_gpis(self, lons, lats):
+        """
+        Find the nearest grid points of the non reference datasets
+        that are read by longitude and latitude for several locations
+        at once.
+
+        This is only done for datasets that are neither grids compatible
+        nor use a lut, have no additional read args and whose class is a
+        pygeobase GriddedBase reader. These readers search the nearest
+        grid point of lon, lat themselves, so reading them by this grid
+        point index gives the same data. Other readers are always read
+        by lon, lat.
+
+        Parameters
+        ----------
+        lons: numpy.ndarray
+            longitudes of the locations
+        lats: numpy.ndarray
+            latitudes of the locations
+
+        Returns
+        -------
+        other_gpis: dict of numpy.ndarrays
+            Dictionary with dataset names as the key and the nearest
+            grid point index for each location as values.
+        """
+        other_gpis = {}
+        lons = np.asarray(lons)
+        lats = np.asarray(lats)
+        if lons.size == 0:
+            return other_gpis
+
+        for other_name in self.other_name:
+            if self.datasets[other_name]['grids_compatible'] or \
+                    self.luts[other_name] is not None:
+                continue
+            ds_class = self.datasets[other_name]['class']
+            if not isinstance(ds_class, GriddedBase) or \
+                    not isinstance(ds_class.grid, BasicGrid) or \
+                    len(self.datasets[other_name]['args']) > 0:
+                continue
+            gpis, _ = ds_class.grid.find_nearest_gpi(lons, lats)
+            other_gpis[other_name] = np.asarray(gpis).reshape(-1)
+
+        return other_gpis
+
+    def get_data(self, gpi, lon, lat, other_gpis=None):
         """
         Get all the data from this manager for a certain
         grid point, longitude, latidude combination.
@@ -303,6 +444,10 @@ class DataManager(object):
             grid point longitude
         lat: type
             grid point latitude
+        other_gpis: dict, optional
+            Already known grid point indices of non reference datasets,
+            e.g. from get_other_gpis. These datasets are read by the
+            grid point index instead of lon, lat.
 
         Returns
         -------
@@ -319,7 +464,7 @@ class DataManager(object):
         if ref_dataframe is None:
             return df_dict
 
-        other_dataframes = self.get_other_data(gpi, lon, lat)
+        other_dataframes = self.get_other_data(gpi, lon, lat, other_gpis)
         # if no other data available continue with the next gpi
         if len(other_dataframes) == 0:
             return df_dict
@@ -329,7 +474,98 @@ class DataManager(object):
 
         return df_dict
 
-    def get_other_data(self, gpi, lon, lat):
+    def get_data_bulk(self, gpis, lons, lats):
+        """
+        Get all the data from this manager for several grid points.
+
+        Each dataset is read for all grid points before the next one is
+        read and grid points are read in the order of the cells of the
+        dataset if its class has a pygeogrids CellGrid. In this way a
+        cell file only has to be opened once even if the grid points are
+        not sorted by the cells of all datasets.
+        Note that all time series are kept in memory at the same time.
+
+        Parameters
+        ----------
+        gpis: numpy.ndarray
+            grid point indices
+        lons: numpy.ndarray
+            grid point longitudes
+        lats: numpy.ndarray
+            grid point latitudes
+
+        Returns
+        -------
+        df_dicts: list of dicts
+            For each grid point, in the order of gpis, the df_dict as
+            returned by get_data for this grid point.
+        """
+        gpis = np.asarray(gpis)
+        lons = np.asarray(lons)
+        lats = np.asarray(lats)
+        other_gpis = self.get_other_gpis(lons, lats)
+
+        ref_dataframes = [None] * len(gpis)
+        for i in self._read_order(self.reference_name, gpis,
+                                  range(len(gpis))):
+            ref_dataframes[i] = self.read_reference(gpis[i])
+        # the other datasets are only needed where reference data exists
+        valid = [i for i, ref_dataframe in enumerate(ref_dataframes)
+                 if ref_dataframe is not None]
+
+        other_dataframes = [{} for _ in range(len(gpis))]
+        for other_name in self.other_name:
+            if self.datasets[other_name]['grids_compatible']:
+                read_gpis = gpis
+            elif self.luts[other_name] is not None:
+                read_gpis = self.luts[other_name][gpis]
+            else:
+                read_gpis = other_gpis.get(other_name)
+
+            if read_gpis is None:
+                indices = valid
+            else:
+                indices = [i for i in valid if read_gpis[i] != -1]
+
+            for i in self._read_order(other_name, read_gpis, indices):
+                if read_gpis is None:
+                    other_dataframe = self.read_other(other_name,
+                                                      lons[i], lats[i])
+                else:
+                    other_dataframe = self.read_other(other_name,
+                                                      read_gpis[i])
+                if other_dataframe is not None:
+                    other_dataframes[i][other_name] = other_dataframe
+
+        df_dicts = []
+        for i in range(len(gpis)):
+            df_dict = {}
+            if ref_dataframes[i] is not None and \
+                    len(other_dataframes[i]) > 0:
+                df_dict = other_dataframes[i]
+                df_dict.update({self.reference_name: ref_dataframes[i]})
+            df_dicts.append(df_dict)
+
+        return df_dicts
+
+    def _read_order(self, name, read_gpis, indices):
+        """
+        Sort the indices of the grid points to read by the cells of the
+        dataset, if the dataset class has a CellGrid.
+        """
+        grid = getattr(self.datasets[name]['class'], 'grid', None)
+        if read_gpis is None or not isinstance(grid, CellGrid) or \
+                len(indices) == 0:
+            return indices
+        indices = np.asarray(indices)
+        try:
+            cells = grid.gpi2cell(np.asarray(read_gpis)[indices])
+        except IndexError:
+            # not all grid point indices are part of the grid
+            return indices
+        return indices[np.argsort(cells, kind='stable')]
+
+    def get_other_data(self, gpi, lon, lat, other_gpis=None):
         """
         Get all the data for non reference datasets
         from this manager for a certain
@@ -343,6 +579,10 @@ class DataManager(object):
             grid point longitude
         lat: type
             grid point latitude
+        other_gpis: dict, optional
+            Already known grid point indices of non reference datasets,
+            e.g. from get_other_gpis. These datasets are read by the
+            grid point index instead of lon, lat.
 
         Returns
         -------
@@ -366,6 +606,9 @@ class DataManager(object):
                     continue
                 other_dataframe = self.read_other(
                     other_name, other_gpi)
+            elif other_gpis is not None and other_name in other_gpis:
+                other_dataframe = self.read_other(
+                    other_name, other_gpis[other_name])
             else:
                 other_dataframe = self.read_other(
                     other_name, lon, lat)
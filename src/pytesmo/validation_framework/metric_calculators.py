@@ -328,10 +328,8 @@ class BasicMetrics(MetadataMetrics):
             return dataset
 
         x, y = data['ref'].values, data[self.other_name].values
-        R, p_R = metrics.pearsonr(x, y)
+        R, p_R, RMSD, BIAS = basic_moments(x, y)
         rho, p_rho = metrics.spearmanr(x, y)
-        RMSD = metrics.rmsd(x, y)
-        BIAS = metrics.bias(x, y)
 
         dataset['R'][0], dataset['p_R'][0] = R, p_R
         dataset['rho'][0], dataset['p_rho'][0] = rho, p_rho
@@ -1178,6 +1176,93 @@ class RollingMetrics(MetadataMetrics):
         return dataset
 
 
+def basic_moments(x, y):
+    """
+    Pearson R with p-value, RMSD and bias of two time series, computed in
+    a single compiled pass (see :func:`_moments`) instead of separate calls
+    to :func:`pytesmo.metrics.pearsonr`, :func:`pytesmo.metrics.rmsd` and
+    :func:`pytesmo.metrics.bias`.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        First input vector.
+    y : numpy.ndarray
+        Second input vector.
+
+    Returns
+    -------
+    R : float
+        Pearson's correlation coefficient.
+    p_R : float
+        2 tailed p-value of R.
+    RMSD : float
+        Root-mean-square deviation.
+    BIAS : float
+        Difference of the mean values, mean(x) - mean(y).
+    """
+    R, RMSD, BIAS = _moments(np.asarray(x, dtype=np.float64),
+                             np.asarray(y, dtype=np.float64))
+    if np.isnan(R):
+        p_R = np.nan
+    elif np.abs(R) == 1.0:
+        p_R = 0.0
+    else:
+        df = len(x) - 2.
+        t_squared = R * R * (df / ((1.0 - R) * (1.0 + R)))
+        p_R = betainc(0.5 * df, 0.5, min(df / (df + t_squared), 1.0))
+
+    return R, p_R, RMSD, BIAS
+
+
+@jit(nopython=True, error_model='numpy')
+def _moments(x, y):
+    """
+    Compiled kernel of :func:`basic_moments`.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        First input vector as float64.
+    y : numpy.ndarray
+        Second input vector as float64.
+
+    Returns
+    -------
+    R : float
+        Pearson's correlation coefficient, nan for constant input.
+    RMSD : float
+        Root-mean-square deviation.
+    BIAS : float
+        Difference of the mean values.
+    """
+    n = x.size
+    mean_x = 0.
+    mean_y = 0.
+    for i in range(n):
+        mean_x += x[i]
+        mean_y += y[i]
+    mean_x /= n
+    mean_y /= n
+
+    sxx = 0.
+    syy = 0.
+    sxy = 0.
+    rss = 0.
+    for i in range(n):
+        dx = x[i] - mean_x
+        dy = y[i] - mean_y
+        sxx += dx * dx
+        syy += dy * dy
+        sxy += dx * dy
+        rss += (x[i] - y[i]) ** 2
+
+    R = sxy / np.sqrt(sxx * syy)
+    R = max(min(R, 1.0), -1.0)
+
+    return R, np.sqrt(rss / n), mean_x - mean_y
+
+
 @jit
 def rolling_pr_rmsd(timestamps, data, window_size, center, min_periods):
     """
@@ -2,11 +2,6 @@ try:
     from IPython import parallel
 except ImportError:
     pass
-try:
-    from itertools import izip as zip
-except ImportError:
-    # python 3
-    pass
 from datetime import datetime
 
 from pytesmo.validation_framework.results_manager import netcdf_results_manager
@@ -35,7 +35,6 @@ import itertools
 import pytesmo.temporal_matching as temp_match
 
 import pandas as pd
-from distutils.version import LooseVersion
 
 class BasicTemporalMatching(object):
     """
@@ -67,12 +66,7 @@ class BasicTemporalMatching(object):
         matched_data = pd.DataFrame(reference)
 
         for match in matched_datasets:
-            if LooseVersion(pd.__version__) < LooseVersion('0.23'):
-                match = match.drop(('index', ''), axis=1)
-            else:
-                match = match.drop('index', axis=1)
-
-            match = match.drop('distance', axis=1)
+            match = match.drop(columns=['index', 'distance'])
             matched_data = matched_data.join(match)
 
         return matched_data.dropna(how='all')
@@ -1,8 +1,10 @@
+from collections import defaultdict
+
 try:
-    from itertools import izip as zip
+    import dask
+    dask_available = True
 except ImportError:
-    # python 3
-    pass
+    dask_available = False
 
 import numpy as np
 import pandas as pd
@@ -14,7 +16,11 @@ from pytesmo.validation_framework.data_manager import get_result_combinations
 from pytesmo.validation_framework.data_scalers import DefaultScaler
 import pytesmo.validation_framework.temporal_matchers as temporal_matchers
 from pytesmo.utils import ensure_iterable
-from distutils.version import LooseVersion
+
+# names of the columns passed to the metrics calculators: 'ref' for the
+# first dataset of a result and 'k1', 'k2', ... for the others
+_RENAME_NAMES = ('ref',) + tuple('k{}'.format(i) for i in range(1, 32))
+
 
 class Validation(object):
 
@@ -97,11 +103,19 @@ class Validation(object):
     scaling_ref : string, optional
         If the scaling should be done to another dataset than the spatial reference then
         give the dataset name here.
+    read_bulk : boolean, optional
+        If set then calc reads the data of all grid points it gets at once
+        using :py:meth:`pytesmo.validation_framework.data_manager.DataManager.get_data_bulk`
+        before processing them. This reads each dataset in the order of its
+        cells but keeps all time series of a job in memory at the same time.
+        Default: False, the data is read for one grid point after the other.
 
     Methods
     -------
-    calc(job)
+    calc(gpis, lons, lats, *args, scheduler=None)
         Takes either a cell or a gpi_info tuple and performs the validation.
+    calc_many(jobs, scheduler='threads', npartitions=None)
+        Performs the validation for several jobs in parallel using dask.
     get_processing_jobs()
         Returns processing jobs that this process can understand.
     """
@@ -111,7 +125,8 @@ class Validation(object):
                  temporal_ref=None,
                  masking_datasets=None,
                  period=None,
-                 scaling='lin_cdf_match', scaling_ref=None):
+                 scaling='lin_cdf_match', scaling_ref=None,
+                 read_bulk=False):
 
         if type(datasets) is DataManager:
             self.data_manager = datasets
@@ -131,6 +146,8 @@ class Validation(object):
         for n, k in self.metrics_c:
             if n < len(self.data_manager.datasets.keys()):
                 raise ValueError('n must be equal to the number of datasets')
+        # ((n, k), metrics_calculator) pairs iterated for every gpi
+        self.metrics_c_items = tuple(self.metrics_c.items())
 
         self.masking_dm = None
         if masking_datasets is not None:
@@ -151,12 +168,79 @@ class Validation(object):
         if self.scaling_ref is None:
             self.scaling_ref = self.data_manager.reference_name
 
-        self.luts = self.data_manager.get_luts()
+        self.luts = self.data_manager.luts
+        self.read_bulk = read_bulk
+
+        # the result combinations only depend on the setup of the
+        # validation so they are computed once instead of for every gpi
+        self.result_plan = self.get_result_plan()
+        self.masking_result_names = None
+        if self.masking_dm is not None:
+            # this will only be one element since n is the same as the
+            # number of masking datasets
+            self.masking_result_names = get_result_names(
+                self.masking_dm.ds_dict, '_reference', n=2)
+
+    def get_result_plan(self):
+        """
+        Get the result combinations for each (n, k) of the metrics
+        calculators together with the columns to extract from the
+        temporally matched data and the new column names.
 
-    def calc(self, gpis, lons, lats, *args):
+        Returns
+        -------
+        result_plan: dict of lists
+            for each (n, k) in the metrics calculators a list of tuples
+            (result_key, result_extract, extract_names, scaling_index,
+            drop_scaling_ref, rename_dict, column_positions).
+            result_key describes the datasets and columns of the result,
+            result_extract the columns to extract from the matched data
+            (including the scaling reference), extract_names the dataset
+            names of these columns, scaling_index the position of the
+            scaling reference in them (None if no scaling is done),
+            drop_scaling_ref if the scaling reference has to be dropped
+            after scaling and rename_dict maps the dataset names
+            to 'ref', 'k1', 'k2', ...
+            column_positions is initially empty and stores the positions
+            of result_extract in the temporally matched data by the key
+            of the matched data, see :py:func:`get_cached_column_positions`.
+        """
+        result_plan = {}
+        for n, k in self.metrics_c:
+            plan = []
+            result_names = get_result_combinations(self.data_manager.ds_dict,
+                                                   n=k)
+            for result_key in result_names:
+                rename_dict = {r[0]: _RENAME_NAMES[i]
+                               for i, r in enumerate(result_key)}
+                result_extract = self.get_result_extract(result_key)
+                extract_names = [r[0] for r in result_extract]
+                scaling_index = None
+                drop_scaling_ref = False
+                if self.scaling is not None:
+                    # the column of the scaling reference and whether it
+                    # was only added for scaling and is not in the
+                    # intended results
+                    scaling_index = extract_names.index(self.scaling_ref)
+                    drop_scaling_ref = self.scaling_ref not in \
+                        [r[0] for r in result_key]
+                plan.append((result_key,
+                             result_extract,
+                             extract_names,
+                             scaling_index,
+                             drop_scaling_ref,
+                             rename_dict,
+                             {}))
+            result_plan[(n, k)] = plan
+
+        return result_plan
+
+    def calc(self, gpis, lons, lats, *args, scheduler=None):
         """
         The argument iterables (lists or numpy.ndarrays) are processed one after the other in
         tuples of the form (gpis[n], lons[n], lats[n], arg1[n], ..).
+        If a scheduler is given the grid points are processed in parallel
+        as independent dask tasks instead.
 
         Parameters
         ----------
@@ -172,6 +256,13 @@ class Validation(object):
             any addiational arguments have to have the same size as the gpis iterable. They are
             given to the metrics calculators as metadata. Common usage is e.g. the long name
             or network name of an in situ station.
+        scheduler: string or distributed.Client, optional
+            dask scheduler used to process the grid points in parallel,
+            e.g. 'threads', 'processes' or a distributed.Client instance.
+            For 'processes' and distributed schedulers the datasets and
+            metric calculators have to be picklable. Requires dask, which
+            can be installed with ``pip install pytesmo[dask]``.
+            Default: None, process the grid points one after the other.
 
         Returns
         -------
@@ -181,7 +272,6 @@ class Validation(object):
             :Values: dict containing the elements returned by metrics_calculator
 
         """
-        results = {}
         if len(args) > 0:
             gpis, lons, lats, args = args_to_iterable(gpis,
                                                       lons,
@@ -191,37 +281,161 @@ class Validation(object):
         else:
             gpis, lons, lats = args_to_iterable(gpis, lons, lats)
 
-        for gpi_info in zip(gpis, lons, lats, *args):
-
-            df_dict = self.data_manager.get_data(gpi_info[0],
-                                                 gpi_info[1],
-                                                 gpi_info[2])
-
-            # if no data is available continue with the next gpi
-            if len(df_dict) == 0:
-                continue
-            matched_data, result, used_data = self.perform_validation(
-                df_dict, gpi_info)
-
-            # add result of one gpi to global results dictionary
-            for r in result:
-                if r not in results:
-                    results[r] = []
-                results[r] = results[r] + result[r]
+        # keep the coordinates as arrays so that they can be used for
+        # operations on all points of the job at once
+        gpis = np.asarray(gpis)
+        lons = np.asarray(lons)
+        lats = np.asarray(lats)
+        n_gpis = len(gpis)
+        if any(len(arg) != n_gpis for arg in (lons, lats) + tuple(args)):
+            raise ValueError("gpis, lons, lats and the additional arguments "
+                             "must have the same length")
+
+        if self.read_bulk:
+            df_dicts = self.data_manager.get_data_bulk(gpis, lons, lats)
+            gpi_jobs = ((gpi_info, None, df_dicts[i])
+                        for i, gpi_info in
+                        enumerate(zip(gpis, lons, lats, *args)))
+        else:
+            # search the nearest neighbours of the datasets that are read
+            # by lon, lat for all points at once instead of once per point
+            other_gpis = self.data_manager.get_other_gpis(lons, lats)
+            gpi_jobs = ((gpi_info,
+                         {name: other_gpis[name][i] for name in other_gpis})
+                        for i, gpi_info in
+                        enumerate(zip(gpis, lons, lats, *args)))
+        if scheduler is None:
+            gpi_results = (self._process_gpi(*gpi_job)
+                           for gpi_job in gpi_jobs)
+        else:
+            if not dask_available:
+                raise ImportError(
+                    "dask is required for processing with a scheduler, "
+                    "install it with pip install pytesmo[dask]")
+            tasks = [dask.delayed(self._process_gpi)(*gpi_job)
+                     for gpi_job in gpi_jobs]
+            gpi_results = dask.compute(*tasks, scheduler=scheduler)
+
+        # collect the first element of each field of the gpi results in
+        # one list per result and field so that the result dicts of the
+        # single gpis do not have to be kept
+        columns = defaultdict(lambda: defaultdict(list))
+        for result in gpi_results:
+            for r, metrics_list in result.items():
+                result_columns = columns[r]
+                for metrics in metrics_list:
+                    for field_name, value in metrics.items():
+                        result_columns[field_name].append(value[:1])
 
         compact_results = {}
 
-        for key in results.keys():
+        for key, result_columns in columns.items():
             compact_results[key] = {}
-            for field_name in results[key][0].keys():
-                entries = []
-                for result in results[key]:
-                    entries.append(result[field_name][0])
-                compact_results[key][field_name] = \
-                    np.array(entries, dtype=results[key][0][field_name].dtype)
+            for field_name, column in result_columns.items():
+                # join the column in one step, the dtype of the first
+                # result is used for all of them
+                compact_results[key][field_name] = np.concatenate(
+                    column).astype(column[0].dtype, copy=False)
 
         return compact_results
 
+    def calc_many(self, jobs, scheduler='threads', npartitions=None):
+        """
+        Perform the validation for several jobs in parallel using dask.
+        Requires dask, which can be installed with
+        ``pip install pytesmo[dask]``.
+
+        Parameters
+        ----------
+        jobs: list
+            List of jobs, e.g. as returned by get_processing_jobs for a
+            CellGrid. Each job is a list of the arguments given to calc,
+            e.g. [gpis, lons, lats], which all have to have the same length.
+            A single job as returned by get_processing_jobs for other grids
+            has to be given as [job].
+        scheduler: string or distributed.Client, optional
+            dask scheduler used to distribute the jobs, e.g. 'threads' or
+            'processes'. If a distributed.Client is given the jobs are
+            submitted to its cluster.
+            For 'processes' and distributed schedulers the datasets and
+            metric calculators have to be picklable.
+            Default: 'threads'
+        npartitions: int, optional
+            Number of partitions the jobs are split into.
+            Default: one partition per job
+
+        Returns
+        -------
+        results: list of dicts
+            Results of calc for each job, in the same order as jobs.
+
+        Raises
+        ------
+        ValueError
+            if a job is not a list or tuple of at least gpis, lons and
+            lats of the same length, see :py:func:`is_job`
+        """
+        if not dask_available:
+            raise ImportError("dask is required for calc_many, install it "
+                              "with pip install pytesmo[dask]")
+        if len(jobs) == 0:
+            return []
+        for job in jobs:
+            if not is_job(job):
+                raise ValueError(
+                    "Each job has to be a list or tuple of at least gpis, "
+                    "lons and lats of the same length, a single job has "
+                    "to be given as [job]")
+
+        if hasattr(scheduler, 'map') and hasattr(scheduler, 'gather'):
+            # distributed.Client
+            futures = scheduler.map(self._calc_job, jobs)
+            return scheduler.gather(futures)
+
+        import dask.bag as db
+        bag = db.from_sequence(jobs, npartitions=npartitions or len(jobs))
+        return bag.map(self._calc_job).compute(scheduler=scheduler)
+
+    def _calc_job(self, job):
+        """
+        Call calc with the arguments stored in a job.
+        """
+        return self.calc(*job)
+
+    def _process_gpi(self, gpi_info, other_gpis=None, df_dict=None):
+        """
+        Read the data for one grid point and calculate its metrics.
+
+        Parameters
+        ----------
+        gpi_info: tuple
+            tuple of at least, (gpi, lon, lat)
+        other_gpis: dict, optional
+            Already known grid point indices of non reference datasets.
+        df_dict: dict of pandas.DataFrames, optional
+            Already read data of the grid point, e.g. from
+            DataManager.get_data_bulk. If given nothing is read.
+
+        Returns
+        -------
+        results: dict
+            Dictionary of calculated metrics stored by dataset combinations
+            tuples. Empty if no data is available for this grid point.
+        """
+        if df_dict is None:
+            df_dict = self.data_manager.get_data(gpi_info[0],
+                                                 gpi_info[1],
+                                                 gpi_info[2],
+                                                 other_gpis)
+
+        # if no data is available there is nothing to calculate
+        if len(df_dict) == 0:
+            return {}
+        matched_data, result, used_data = self.perform_validation(
+            df_dict, gpi_info)
+
+        return result
+
     def perform_validation(self,
                            df_dict,
                            gpi_info):
@@ -245,7 +459,7 @@ class Validation(object):
         used_data: dict
             The DataFrame used for calculation of each set of metrics.
         """
-        results = {}
+        results = defaultdict(list)
         used_data = {}
         matched_n = {}
 
@@ -254,63 +468,62 @@ class Validation(object):
             masked_ref_df = self.mask_dataset(ref_df,
                                               gpi_info)
             if len(masked_ref_df) == 0:
-                return matched_n, results, used_data
+                return matched_n, dict(results), used_data
 
             df_dict[self.temporal_ref] = masked_ref_df
 
         matched_n = self.temporal_match_datasets(df_dict)
+        scaling = self.scaling
 
-        for n, k in self.metrics_c:
+        for (n, k), metrics_calculator in self.metrics_c_items:
             n_matched_data = matched_n[(n, k)]
             if len(n_matched_data) == 0:
                 continue
-            result_names = get_result_combinations(self.data_manager.ds_dict,
-                                                   n=k)
-            for data, result_key in self.k_datasets_from(n_matched_data,
-                                                         result_names):
-
+            matched_keys = get_matched_keys(n_matched_data)
+            for (result_key, result_extract, extract_names, scaling_index,
+                 drop_scaling_ref, rename_dict,
+                 column_positions) in self.result_plan[(n, k)]:
+
+                matched_key = self.find_matched_key(n_matched_data,
+                                                    result_extract,
+                                                    matched_keys)
+                if matched_key is None:
+                    continue
+                matched_data = n_matched_data[matched_key]
+
+                # select the columns by position and directly use the dataset
+                # names as column names instead of selecting from and
+                # renaming the column multiindex
+                data = matched_data.iloc[
+                    :, get_cached_column_positions(matched_data,
+                                                   result_extract,
+                                                   column_positions,
+                                                   matched_key)]
+                data.columns = extract_names
+                data = data.dropna()
                 if len(data) == 0:
                     continue
 
-                # at this stage we can drop the column multiindex and just use
-                # the dataset name
-                if LooseVersion(pd.__version__) < LooseVersion('0.23'):
-                    data.columns = data.columns.droplevel(level=1)
-                else:
-                    data = data.rename(columns=lambda x: x[0])
-
-                if self.scaling is not None:
-                    # get scaling index by finding the column in the
-                    # DataFrame that belongs to the scaling reference
-                    scaling_index = data.columns.tolist().index(self.scaling_ref)
+                if scaling is not None:
                     try:
-                        data = self.scaling.scale(data,
-                                                  scaling_index,
-                                                  gpi_info)
+                        data = scaling.scale(data,
+                                             scaling_index,
+                                             gpi_info)
                     except ValueError:
                         continue
                     # Drop the scaling reference if it was not in the intended
                     # results
-                    if self.scaling_ref not in [key[0] for key in result_key]:
+                    if drop_scaling_ref:
                         data = data.drop(columns=[self.scaling_ref])
 
-
                 # Rename the columns to 'ref', 'k1', 'k2', ...
-                rename_dict = {}
-                f = lambda x: "k{}".format(x) if x > 0 else 'ref'
-                for i, r in enumerate(result_key):
-                    rename_dict[r[0]] = f(i)
                 data.rename(columns=rename_dict, inplace=True)
 
-                if result_key not in results.keys():
-                    results[result_key] = []
-
-                metrics_calculator = self.metrics_c[(n, k)]
                 used_data[result_key] = data
                 metrics = metrics_calculator(data, gpi_info)
                 results[result_key].append(metrics)
 
-        return matched_n, results, used_data
+        return matched_n, dict(results), used_data
 
     def mask_dataset(self, ref_df, gpi_info):
         """
@@ -329,14 +542,9 @@ class Validation(object):
         """
 
         matched_masking = self.temporal_match_masking_data(ref_df, gpi_info)
-        # this will only be one element since n is the same as the
-        # number of masking datasets
-        result_names = get_result_names(self.masking_dm.ds_dict,
-                                        '_reference',
-                                        n=2)
         choose_all = pd.DataFrame(index=ref_df.index)
         for data, result in self.k_datasets_from(matched_masking,
-                                                 result_names,
+                                                 self.masking_result_names,
                                                  include_scaling_ref=False):
             if len(data) == 0:
                 continue
@@ -399,13 +607,17 @@ class Validation(object):
             matched dataframes
         """
 
+        # the temporal matching only depends on n, so metrics calculators
+        # with the same n can share the matched data
+        matched_by_n = {}
+        for n in set(n for n, k in self.metrics_c):
+            matched_by_n[n] = self.temp_matching(df_dict,
+                                                 self.temporal_ref,
+                                                 n=n)
+
         matched_n = {}
         for n, k in self.metrics_c:
-            matched_data = self.temp_matching(df_dict,
-                                              self.temporal_ref,
-                                              n=n)
-
-            matched_n[(n, k)] = matched_data
+            matched_n[(n, k)] = matched_by_n[n]
 
         return matched_n
 
@@ -440,17 +652,41 @@ class Validation(object):
 
         for result in result_names:
             result_extract = result
-            if self.scaling is not None and include_scaling_ref:
-                # always make sure the scaling reference is included in the results
-                # otherwise the scaling will fail
-                scaling_ref_column = self.data_manager.datasets[self.scaling_ref]['columns'][0]
-                scaling_result_name = (self.scaling_ref, scaling_ref_column)
-                if scaling_result_name not in result:
-                    result_extract = result + (scaling_result_name,)
+            if include_scaling_ref:
+                result_extract = self.get_result_extract(result)
             data = self.get_data_for_result_tuple(n_matched_data, result_extract)
             yield data, result
 
-    def get_data_for_result_tuple(self, n_matched_data, result_tuple):
+    def get_result_extract(self, result):
+        """
+        Get the columns that have to be extracted from the temporally
+        matched data to calculate a result.
+
+        Parameters
+        ----------
+        result: tuple
+            Tuple describing which datasets and columns are in
+            the result. ((dataset_name, column_name), (dataset_name2, column_name2))
+
+        Returns
+        -------
+        result_extract: tuple
+            The result tuple extended by the scaling reference if scaling
+            is performed and the scaling reference is not already part of
+            the result.
+        """
+        result_extract = result
+        if self.scaling is not None:
+            # always make sure the scaling reference is included in the results
+            # otherwise the scaling will fail
+            scaling_ref_column = self.data_manager.datasets[self.scaling_ref]['columns'][0]
+            scaling_result_name = (self.scaling_ref, scaling_ref_column)
+            if scaling_result_name not in result:
+                result_extract = result + (scaling_result_name,)
+        return result_extract
+
+    def get_data_for_result_tuple(self, n_matched_data, result_tuple,
+                                  matched_keys=None):
         """
         Extract a dataframe for a given result tuple from the
         matched dataframes.
@@ -463,6 +699,10 @@ class Validation(object):
         result_tuple: tuple
             Tuple describing which datasets and columns should be
             extracted. ((dataset_name, column_name), (dataset_name2, column_name2))
+        matched_keys: dict, optional
+            Keys of n_matched_data stored by the set of datasets they
+            contain, see :py:func:`get_matched_keys`. Calculated if not
+            given.
 
         Returns
         -------
@@ -470,47 +710,10 @@ class Validation(object):
             pandas DataFrame with columns extracted from the
             temporally matched datasets
         """
-        # find the key into the temporally matched dataset by combining the
-        # dataset parts of the result_names
-        dskey = []
-        for i, r in enumerate(result_tuple):
-            dskey.append(r[0])
-
-        dskey = tuple(dskey)
-        if len(list(n_matched_data)[0]) == len(dskey):
-            # we should have an exact match of datasets and
-            # temporal matches
-
-            try:
-                # still need to make sure that dskey is in the right order and
-                # contains all the same datasets as the n_matched_data
-                if sorted(dskey) == sorted(list(n_matched_data.keys())[0]):
-                    dskey = list(n_matched_data.keys())[0]
-
-                data = n_matched_data[dskey]
-            except KeyError:
-                # if not then temporal matching between two datasets was
-                # unsuccessful
-                return []
-        else:
-            # more datasets were temporally matched than are
-            # requested now so we select a temporally matched
-            # dataset that has the first key in common with the
-            # temporal reference.
-
-            # This guarantees that we only select columns from dataframes for
-            # which the temporal reference dataset was included in the temporal
-            # matching
-
-            first_match = [
-                key for key in n_matched_data if self.temporal_ref == key[0]]
-            found_key = None
-            for key in first_match:
-                for dsk in dskey:
-                    if dsk not in key:
-                        continue
-                found_key = key
-            data = n_matched_data[found_key]
+        data = self.find_matched_data(n_matched_data, result_tuple,
+                                      matched_keys)
+        if data is None:
+            return []
 
         # extract only the relevant columns from matched DataFrame
         data = data[[x for x in result_tuple]]
@@ -518,6 +721,88 @@ class Validation(object):
         data = data.dropna()
         return data
 
+    def find_matched_data(self, n_matched_data, result_tuple,
+                          matched_keys=None):
+        """
+        Find the temporally matched DataFrame that contains the
+        datasets of a given result tuple.
+
+        Parameters
+        ----------
+        n_matched_data: dict of pandas.DataFrames
+            DataFrames in which n datasets were temporally matched.
+            The key is a tuple of the dataset names.
+        result_tuple: tuple
+            Tuple describing which datasets and columns should be
+            extracted. ((dataset_name, column_name), (dataset_name2, column_name2))
+        matched_keys: dict, optional
+            Keys of n_matched_data stored by the set of datasets they
+            contain, see :py:func:`get_matched_keys`. Calculated if not
+            given.
+
+        Returns
+        -------
+        data: pd.DataFrame or None
+            temporally matched DataFrame containing all datasets of
+            the result tuple. None if there is no such DataFrame.
+        """
+        key = self.find_matched_key(n_matched_data, result_tuple,
+                                    matched_keys)
+        if key is None:
+            return None
+        return n_matched_data[key]
+
+    def find_matched_key(self, n_matched_data, result_tuple,
+                         matched_keys=None):
+        """
+        Find the key of the temporally matched DataFrame that contains
+        the datasets of a given result tuple, see find_matched_data.
+
+        Parameters
+        ----------
+        n_matched_data: dict of pandas.DataFrames
+            DataFrames in which n datasets were temporally matched.
+            The key is a tuple of the dataset names.
+        result_tuple: tuple
+            Tuple describing which datasets and columns should be
+            extracted. ((dataset_name, column_name), (dataset_name2, column_name2))
+        matched_keys: dict, optional
+            Keys of n_matched_data stored by the set of datasets they
+            contain, see :py:func:`get_matched_keys`. Calculated if not
+            given.
+
+        Returns
+        -------
+        key: tuple or None
+            key into n_matched_data. None if there is no DataFrame
+            containing all datasets of the result tuple.
+        """
+        # find the key into the temporally matched dataset by combining the
+        # dataset parts of the result_names
+        datasets = frozenset(r[0] for r in result_tuple)
+        if matched_keys is None:
+            matched_keys = get_matched_keys(n_matched_data)
+
+        if len(next(iter(n_matched_data))) == len(datasets):
+            # we should have an exact match of datasets and
+            # temporal matches, independent of the order of the datasets.
+            # If not then temporal matching between two datasets was
+            # unsuccessful
+            return matched_keys.get(datasets)
+
+        # more datasets were temporally matched than are
+        # requested now so we select a temporally matched
+        # dataset that has the first key in common with the
+        # temporal reference.
+
+        # This guarantees that we only select columns from dataframes for
+        # which the temporal reference dataset was included in the temporal
+        # matching
+        for key in n_matched_data:
+            if key[0] == self.temporal_ref and datasets.issubset(key):
+                return key
+        return None
+
     def get_processing_jobs(self):
         """
         Returns processing jobs that this process can understand.
@@ -543,6 +828,129 @@ class Validation(object):
         return jobs
 
 
+def get_column_positions(df, columns):
+    """
+    Get the integer positions of columns in a DataFrame.
+
+    Parameters
+    ----------
+    df: pandas.DataFrame
+        DataFrame containing the columns
+    columns: iterable
+        column names to look up
+
+    Returns
+    -------
+    positions: numpy.ndarray
+        integer position of each of the columns in df
+
+    Raises
+    ------
+    KeyError
+        if one of the columns is not in df
+    """
+    positions = df.columns.get_indexer(list(columns))
+    if (positions == -1).any():
+        missing = [c for c, p in zip(columns, positions) if p == -1]
+        raise KeyError("Columns {} not in DataFrame".format(missing))
+    return positions
+
+
+def get_cached_column_positions(df, columns, cache, key):
+    """
+    Get the integer positions of columns in a DataFrame like
+    :py:func:`get_column_positions`, but store them in cache by key.
+
+    Stored positions are reused as long as the columns of df at these
+    positions are the requested ones, otherwise they are looked up again.
+
+    Parameters
+    ----------
+    df: pandas.DataFrame
+        DataFrame containing the columns
+    columns: list
+        column names to look up
+    cache: dict
+        positions found so far stored by key
+    key: hashable
+        key under which the positions are stored, e.g. the key of the
+        temporally matched DataFrame
+
+    Returns
+    -------
+    positions: numpy.ndarray
+        integer position of each of the columns in df
+
+    Raises
+    ------
+    KeyError
+        if one of the columns is not in df
+    """
+    positions = cache.get(key)
+    if positions is not None:
+        df_columns = df.columns
+        n_columns = len(df_columns)
+        if all(p < n_columns and df_columns[p] == c
+               for p, c in zip(positions, columns)):
+            return positions
+
+    positions = get_column_positions(df, columns)
+    cache[key] = positions
+    return positions
+
+
+def get_matched_keys(n_matched_data):
+    """
+    Store the keys of temporally matched data by the set of datasets
+    they contain to look them up independent of the order of the datasets.
+
+    Parameters
+    ----------
+    n_matched_data: dict of pandas.DataFrames
+        DataFrames in which n datasets were temporally matched.
+        The key is a tuple of the dataset names.
+
+    Returns
+    -------
+    matched_keys: dict
+        :Keys: frozenset of the dataset names
+        :Values: key into n_matched_data
+    """
+    return {frozenset(key): key for key in n_matched_data}
+
+
+def is_job(job):
+    """
+    Check if job can be processed by Validation.calc, i.e. if it is a
+    list or tuple of at least gpis, lons and lats and possibly further
+    arguments that have the same length after being made iterable in the
+    same way as in calc.
+
+    A single array, e.g. one of the elements of [gpis, lons, lats] as
+    returned by get_processing_jobs for grids that are not a CellGrid,
+    is no job.
+
+    Parameters
+    ----------
+    job: object
+        job to check
+
+    Returns
+    -------
+    valid: boolean
+        True if the job can be processed
+    """
+    if not isinstance(job, (list, tuple)) or len(job) < 3:
+        return False
+
+    arguments = list(args_to_iterable(*job))
+    try:
+        n_gpis = len(arguments[0])
+        return all(len(arg) == n_gpis for arg in arguments[1:])
+    except TypeError:
+        return False
+
+
 def args_to_iterable(*args, **kwargs):
     """
     Convert arguments to iterables.
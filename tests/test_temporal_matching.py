@@ -116,6 +116,34 @@ def test_df_match_borders_unequal_query_points():
     nptest.assert_allclose(np.array([0, 1, 1, 2, 3]), matched.matched_data)
 
 
+def test_df_match_dropduplicates():
+    """
+    Each matched value is only kept for the closest reference time stamp,
+    for equally close ones the first is kept.
+    """
+    ref_df = pd.DataFrame({"data": np.arange(5)}, index=pd.date_range(datetime(2007, 1, 1, 0),
+                                                                      "2007-01-05", freq="D"))
+    # the value at 2007-01-03 12:00 is the nearest one for the reference
+    # time stamps 2007-01-03 and 2007-01-04 and equally close to both
+    match_df = pd.DataFrame({"matched_data": np.arange(4)},
+                            index=[datetime(2007, 1, 1, 9),
+                                   datetime(2007, 1, 2, 9),
+                                   datetime(2007, 1, 3, 12),
+                                   datetime(2007, 1, 5, 9)])
+    matched = tmatching.df_match(ref_df, match_df)
+    nptest.assert_allclose(np.array([0, 1, 2, 2, 3]), matched.matched_data)
+    nptest.assert_allclose(
+        np.array([0.375, 0.375, 0.5, -0.5, 0.375]), matched.distance.values)
+
+    matched = tmatching.df_match(ref_df, match_df, dropduplicates=True)
+
+    assert list(matched.index) == [datetime(2007, 1, 1), datetime(2007, 1, 2),
+                                   datetime(2007, 1, 3), datetime(2007, 1, 5)]
+    nptest.assert_allclose(np.array([0, 1, 2, 3]), matched.matched_data)
+    nptest.assert_allclose(
+        np.array([0.375, 0.375, 0.5, 0.375]), matched.distance.values)
+
+
 def test_matching():
     """
     test matching function
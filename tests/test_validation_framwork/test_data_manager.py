@@ -30,6 +30,8 @@
 Test for the data manager
 '''
 
+import os
+
 import pandas.testing as pdtest
 import pytest
 import numpy as np
@@ -213,6 +215,165 @@ def test_DataManager_get_data():
     assert sorted(list(data)) == ['DS1', 'DS2', 'DS3']
 
 
+def test_DataManager_get_other_gpis():
+
+    datasets = setup_TestDatasets()
+    datasets['DS3']['grids_compatible'] = False
+    dm = DataManager(datasets, 'DS1', read_ts_names={f'DS{i}': 'read' for i in range(1,4)})
+
+    # only DS3 is read by lon, lat
+    other_gpis = dm.get_other_gpis(np.array([1.1, 3.9]), np.array([1., 4.]))
+    assert list(other_gpis) == ['DS3']
+    np.testing.assert_equal(other_gpis['DS3'], np.array([1, 4]))
+
+    data = dm.get_data(1, 1.1, 1., other_gpis={'DS3': other_gpis['DS3'][0]})
+    assert sorted(list(data)) == ['DS1', 'DS2', 'DS3']
+    assert dm.get_other_gpis(np.array([]), np.array([])) == {}
+
+
+def test_DataManager_get_data_bulk():
+
+    datasets = setup_TestDatasets()
+    datasets['DS3']['grids_compatible'] = False
+    dm = DataManager(datasets, 'DS1', read_ts_names={f'DS{i}': 'read' for i in range(1,4)})
+
+    gpis = np.array([4, 1, 3, 2])
+    lons = np.array([4, 1.1, 3, 2])
+    lats = np.array([1, 4, 2, 4])
+    df_dicts = dm.get_data_bulk(gpis, lons, lats)
+    assert len(df_dicts) == 4
+    for df_dict, gpi, lon, lat in zip(df_dicts, gpis, lons, lats):
+        data = dm.get_data(gpi, lon, lat)
+        assert sorted(list(df_dict)) == sorted(list(data))
+        for name in data:
+            pdtest.assert_frame_equal(df_dict[name], data[name])
+
+
+class CountingTestDataset(TestDataset):
+    """
+    Test dataset that counts how often it was read. If a log list is
+    given then opening the dataset and every read gpi is recorded in it.
+    """
+    __test__ = False
+
+    def __init__(self, *args, log=None, **kwargs):
+        super(CountingTestDataset, self).__init__(*args, **kwargs)
+        self.reads = 0
+        self.log = log
+        if self.log is not None:
+            self.log.append((self.filename, 'open'))
+
+    def read(self, *args, **kwargs):
+        self.reads += 1
+        if self.log is not None:
+            self.log.append((self.filename, args[0]))
+        return super(CountingTestDataset, self).read(*args, **kwargs)
+
+
+class GpiTestDataset(CountingTestDataset):
+    """Counting test dataset whose data depends on the grid point."""
+    __test__ = False
+
+    def read(self, gpi, **kwargs):
+        return super(GpiTestDataset, self).read(gpi, **kwargs) * gpi
+
+
+def test_DataManager_get_data_bulk_read_order():
+
+    grid = grids.CellGrid(np.array([1, 2, 3, 4]), np.array([1, 2, 3, 4]),
+                          np.array([4, 4, 2, 1]), gpis=np.array([1, 2, 3, 4]))
+    log = []
+    datasets = {}
+    for name, columns in [('DS1', ['x']), ('DS2', ['y']), ('DS3', ['x'])]:
+        datasets[name] = {
+            'class': GriddedTsBase(name, grid, GpiTestDataset,
+                                   ioclass_kws={'log': log}),
+            'columns': columns}
+    datasets['DS2']['grids_compatible'] = True
+    # DS3 is read by the nearest gpi of lon, lat
+    dm = DataManager(datasets, 'DS1', read_ts_names='read')
+
+    # gpi 1 is given twice with different locations
+    gpis = np.array([4, 1, 3, 2, 1])
+    lons = np.array([4, 1, 3, 2, 3.9])
+    lats = np.array([4, 1, 3, 2, 4.1])
+    df_dicts = dm.get_data_bulk(gpis, lons, lats)
+
+    # every dataset is read cell by cell and each cell is opened once
+    def dataset_log(name):
+        return [(os.path.basename(fname), entry) for fname, entry in log
+                if os.path.dirname(fname) == name]
+
+    for name in ['DS1', 'DS2']:
+        assert dataset_log(name) == [
+            ('0001', 'open'), ('0001', 4), ('0002', 'open'), ('0002', 3),
+            ('0004', 'open'), ('0004', 1), ('0004', 2), ('0004', 1)]
+    assert dataset_log('DS3') == [
+        ('0001', 'open'), ('0001', 4), ('0001', 4), ('0002', 'open'),
+        ('0002', 3), ('0004', 'open'), ('0004', 1), ('0004', 2)]
+
+    # the data is returned in the order of the input points
+    assert len(df_dicts) == 5
+    for df_dict, gpi, lon, lat in zip(df_dicts, gpis, lons, lats):
+        data = dm.get_data(gpi, lon, lat)
+        assert sorted(list(df_dict)) == sorted(list(data))
+        for name in data:
+            pdtest.assert_frame_equal(df_dict[name], data[name])
+    assert df_dicts[1]['DS3']['x'][1] == 1
+    assert df_dicts[4]['DS3']['x'][1] == 4
+
+
+def test_DataManager_read_cache():
+
+    datasets = {
+        'DS1': {'class': CountingTestDataset(""), 'columns': ['x']},
+        'DS2': {'class': CountingTestDataset(""), 'columns': ['y'],
+                'grids_compatible': True}}
+    dm = DataManager(datasets, 'DS1', read_ts_names='read', read_cache_size=2)
+
+    data = dm.get_data(1, 1, 1)
+    data_again = dm.get_data(1, 1, 1)
+    assert datasets['DS1']['class'].reads == 1
+    assert datasets['DS2']['class'].reads == 1
+    assert data_again['DS1'] is data['DS1']
+
+    # only the last two time series are kept
+    dm.get_data(2, 2, 2)
+    dm.get_data(1, 1, 1)
+    assert datasets['DS1']['class'].reads == 3
+
+    # without cache everything is read again
+    dm = DataManager(datasets, 'DS1', read_ts_names='read')
+    dm.get_data(1, 1, 1)
+    dm.get_data(1, 1, 1)
+    assert datasets['DS1']['class'].reads == 5
+
+
+def test_DataManager_lut_cache(tmpdir):
+
+    datasets = setup_TestDatasets()
+    datasets['DS3']['grids_compatible'] = False
+    datasets['DS3']['use_lut'] = True
+    lut_path = str(tmpdir.join('luts'))
+    dm = DataManager(datasets, 'DS1', lut_cache_path=lut_path)
+    assert len(tmpdir.join('luts').listdir()) == 1
+
+    # the stored lut is loaded instead of calculated again
+    calc_lut = dm.reference_grid.calc_lut
+    dm.reference_grid.calc_lut = None
+    try:
+        dm_cached = DataManager(datasets, 'DS1', lut_cache_path=lut_path)
+    finally:
+        dm.reference_grid.calc_lut = calc_lut
+    np.testing.assert_equal(dm_cached.luts['DS3'], dm.luts['DS3'])
+    assert dm_cached.luts['DS2'] is None
+
+    # a different lut_max_dist is stored separately
+    datasets['DS3']['lut_max_dist'] = 1000
+    DataManager(datasets, 'DS1', lut_cache_path=lut_path)
+    assert len(tmpdir.join('luts').listdir()) == 2
+
+
 def test_get_result_names():
 
     tst_ds_dict = {'DS1': ['soil moisture'],
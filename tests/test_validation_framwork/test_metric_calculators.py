@@ -37,6 +37,7 @@ from pytesmo.validation_framework.metric_calculators import FTMetrics
 from pytesmo.validation_framework.metric_calculators import HSAF_Metrics
 from pytesmo.validation_framework.metric_calculators import RollingMetrics
 from pytesmo.validation_framework.metric_calculators import MonthsMetricsAdapter
+from pytesmo.validation_framework.metric_calculators import basic_moments
 import pytesmo.metrics as metrics
 
 import warnings
@@ -120,6 +121,27 @@ def test_BasicMetrics_calculator():
     assert (np.isnan(res['p_R']) or res['p_R'] == 1.0)
 
 
+def test_basic_moments():
+    """
+    Test the compiled moments against the reference metrics.
+    """
+    np.random.seed(0)
+    x = np.random.randn(100)
+    y = 0.5 * x + np.random.randn(100)
+
+    R, p_R, RMSD, BIAS = basic_moments(x, y)
+    R_should, p_R_should = metrics.pearsonr(x, y)
+
+    np.testing.assert_almost_equal(R, R_should)
+    np.testing.assert_almost_equal(p_R, p_R_should)
+    np.testing.assert_almost_equal(RMSD, metrics.rmsd(x, y))
+    np.testing.assert_almost_equal(BIAS, metrics.bias(x, y))
+
+    R, p_R, RMSD, BIAS = basic_moments(np.ones(20), y[:20])
+    assert np.isnan(R)
+    assert np.isnan(p_R)
+
+
 def test_BasicMetrics_calculator_metadata():
     """
     Test BasicMetrics with metadata.
@@ -35,6 +35,7 @@ import os
 import tempfile
 import netCDF4 as nc
 import numpy as np
+import pandas as pd
 import numpy.testing as nptest
 import pytest
 
@@ -54,11 +55,13 @@ from ismn.interface import ISMN_Interface
 
 from pytesmo.validation_framework.validation import Validation
 from pytesmo.validation_framework.validation import args_to_iterable
+from pytesmo.validation_framework.validation import get_cached_column_positions
 
 from tests.test_validation_framwork.test_datasets import setup_TestDatasets
 from tests.test_validation_framwork.test_datasets import setup_two_without_overlap
 from tests.test_validation_framwork.test_datasets import setup_three_with_two_overlapping
 from tests.test_validation_framwork.test_datasets import MaskingTestDataset
+from tests.test_validation_framwork.test_datasets import TestDataset
 
 import warnings
 
@@ -305,6 +308,96 @@ def test_validation_error_n2_k2():
             metrics_calculators={
                 (2, 2): metrics_calculators.BasicMetrics(other_name='k1').calc_metrics})
 
+def test_validation_n3_k2_read_bulk():
+
+    datasets = setup_TestDatasets()
+    dm = DataManager(datasets, 'DS1', read_ts_names={d: 'read' for d in ['DS1', 'DS2', 'DS3']})
+
+    metrics_c = {
+        (3, 2): metrics_calculators.BasicMetrics(other_name='k1').calc_metrics}
+    process = Validation(
+        dm, 'DS1',
+        temporal_matcher=temporal_matchers.BasicTemporalMatching(
+            window=1 / 24.0).combinatory_matcher,
+        scaling='lin_cdf_match',
+        metrics_calculators=metrics_c)
+    process_bulk = Validation(
+        dm, 'DS1',
+        temporal_matcher=temporal_matchers.BasicTemporalMatching(
+            window=1 / 24.0).combinatory_matcher,
+        scaling='lin_cdf_match',
+        metrics_calculators=metrics_c,
+        read_bulk=True)
+
+    jobs = process.get_processing_jobs()
+    for job in jobs:
+        results = process.calc(*job)
+        results_bulk = process_bulk.calc(*job)
+        assert sorted(list(results)) == sorted(list(results_bulk))
+        for key in results:
+            for metric in results[key]:
+                nptest.assert_equal(results[key][metric],
+                                    results_bulk[key][metric])
+
+
+class LonLatTestDataset(TestDataset):
+    """
+    Test dataset with a grid attribute that can only be read by lon, lat.
+    """
+    __test__ = False
+
+    def __init__(self, *args, **kwargs):
+        super(LonLatTestDataset, self).__init__(*args, **kwargs)
+        self.grid = grids.BasicGrid(np.array([1., 2.]), np.array([1., 2.]))
+        self.locations = []
+
+    def read(self, lon, lat, **kwargs):
+        self.locations.append((lon, lat))
+        return super(LonLatTestDataset, self).read(**kwargs)
+
+
+def test_validation_lonlat_reader_with_grid():
+
+    datasets = {
+        'DS1': {'class': TestDataset(""), 'columns': ['x']},
+        'DS2': {'class': LonLatTestDataset(""), 'columns': ['y']}}
+
+    for read_bulk in [False, True]:
+        process = Validation(
+            datasets, 'DS1',
+            temporal_matcher=temporal_matchers.BasicTemporalMatching(
+                window=1 / 24.0).combinatory_matcher,
+            scaling=None,
+            metrics_calculators={
+                (2, 2): metrics_calculators.BasicMetrics(other_name='k1').calc_metrics},
+            read_bulk=read_bulk)
+        assert process.data_manager.get_other_gpis([1., 2.], [1., 2.]) == {}
+
+        datasets['DS2']['class'].locations = []
+        results = process.calc([0, 1], [1., 2.], [1., 2.])
+        assert datasets['DS2']['class'].locations == [(1., 1.), (2., 2.)]
+        nptest.assert_equal(
+            results[(('DS1', 'x'), ('DS2', 'y'))]['n_obs'], np.array([1000, 1000]))
+
+
+def test_validation_calc_length_mismatch():
+
+    datasets = setup_TestDatasets()
+    dm = DataManager(datasets, 'DS1', read_ts_names={d: 'read' for d in ['DS1', 'DS2', 'DS3']})
+
+    process = Validation(
+        dm, 'DS1',
+        temporal_matcher=temporal_matchers.BasicTemporalMatching(
+            window=1 / 24.0).combinatory_matcher,
+        metrics_calculators={
+            (3, 2): metrics_calculators.BasicMetrics(other_name='k1').calc_metrics})
+
+    with pytest.raises(ValueError):
+        process.calc([1, 2], [1, 2], [1])
+    with pytest.raises(ValueError):
+        process.calc([1, 2], [1, 2], [1, 2], ['a'])
+
+
 def test_validation_n3_k2_temporal_matching_no_matches():
 
     tst_results = {}
@@ -515,6 +608,32 @@ def test_validation_n3_k2():
         assert sorted(list(results)) == sorted(list(tst_results))
 
 
+def test_validation_n3_k2_dask_scheduler():
+
+    pytest.importorskip('dask')
+
+    datasets = setup_TestDatasets()
+    dm = DataManager(datasets, 'DS1', read_ts_names={d: 'read' for d in ['DS1', 'DS2', 'DS3']})
+
+    process = Validation(
+        dm, 'DS1',
+        temporal_matcher=temporal_matchers.BasicTemporalMatching(
+            window=1 / 24.0).combinatory_matcher,
+        scaling='lin_cdf_match',
+        metrics_calculators={
+            (3, 2): metrics_calculators.BasicMetrics(other_name='k1').calc_metrics})
+
+    jobs = process.get_processing_jobs()
+    for job in jobs:
+        results = process.calc(*job)
+        results_dask = process.calc(*job, scheduler='threads')
+        assert sorted(list(results)) == sorted(list(results_dask))
+        for key in results:
+            for metric in results[key]:
+                nptest.assert_equal(results[key][metric],
+                                    results_dask[key][metric])
+
+
 def test_validation_n3_k2_temporal_matching_no_matches():
 
     tst_results = {
@@ -713,6 +832,44 @@ def test_validation_n3_k2_masking():
             nptest.assert_almost_equal(results[key]['n_obs'],
                                        tst[tst_key]['n_obs'])
 
+def test_validation_masking_no_future_warning():
+    """
+    Temporally matching the boolean masking data must not raise pandas
+    FutureWarnings for every grid point.
+    """
+    datasets = setup_TestDatasets()
+    grid = grids.CellGrid(np.array([1, 2, 3, 4]), np.array([1, 2, 3, 4]),
+                          np.array([4, 4, 2, 1]), gpis=np.array([1, 2, 3, 4]))
+    mds = {
+        'masking1': {
+            'class': GriddedTsBase("", grid, MaskingTestDataset),
+            'columns': ['x'],
+            'kwargs': {'limit': 500},
+            'grids_compatible': True},
+        'masking2': {
+            'class': GriddedTsBase("", grid, MaskingTestDataset),
+            'columns': ['x'],
+            'kwargs': {'limit': 750},
+            'grids_compatible': True}
+    }
+
+    process = Validation(
+        datasets, 'DS1',
+        temporal_matcher=temporal_matchers.BasicTemporalMatching(
+            window=1 / 24.0).combinatory_matcher,
+        scaling='lin_cdf_match',
+        metrics_calculators={
+            (3, 2): metrics_calculators.BasicMetrics(other_name='k1').calc_metrics},
+        masking_datasets=mds)
+
+    ref_df = datasets['DS1']['class'].read(1)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=DeprecationWarning)
+        warnings.simplefilter('error', category=FutureWarning)
+        new_ref_df = process.mask_dataset(ref_df, (1, 1, 1))
+    assert len(new_ref_df) == 250
+
+
 @pytest.mark.full_framework
 def test_ascat_ismn_validation_metadata_rolling():
     """
@@ -817,6 +974,189 @@ def test_ascat_ismn_validation_metadata_rolling():
     assert np.all(reader.read_ts(1).columns.values ==
                   np.array(['R', 'p_R', 'RMSD']))
 
+def test_validation_n3_k2_calc_many():
+
+    pytest.importorskip('dask')
+
+    datasets = setup_TestDatasets()
+    dm = DataManager(datasets, 'DS1', read_ts_names={d: 'read' for d in ['DS1', 'DS2', 'DS3']})
+
+    process = Validation(
+        dm, 'DS1',
+        temporal_matcher=temporal_matchers.BasicTemporalMatching(
+            window=1 / 24.0).combinatory_matcher,
+        scaling='lin_cdf_match',
+        metrics_calculators={
+            (3, 2): metrics_calculators.BasicMetrics(other_name='k1').calc_metrics})
+
+    jobs = process.get_processing_jobs()
+    results_many = process.calc_many(jobs, scheduler='threads')
+    assert len(results_many) == len(jobs)
+    for job, results_dask in zip(jobs, results_many):
+        results = process.calc(*job)
+        assert sorted(list(results)) == sorted(list(results_dask))
+        for key in results:
+            for metric in results[key]:
+                nptest.assert_equal(results[key][metric],
+                                    results_dask[key][metric])
+
+
+def test_validation_calc_many_job_shape():
+
+    pytest.importorskip('dask')
+
+    datasets = setup_TestDatasets()
+    dm = DataManager(datasets, 'DS1', read_ts_names={d: 'read' for d in ['DS1', 'DS2', 'DS3']})
+
+    process = Validation(
+        dm, 'DS1',
+        temporal_matcher=temporal_matchers.BasicTemporalMatching(
+            window=1 / 24.0).combinatory_matcher,
+        scaling='lin_cdf_match',
+        metrics_calculators={
+            (3, 2): metrics_calculators.BasicMetrics(other_name='k1').calc_metrics})
+
+    # a single job as returned by get_processing_jobs for a BasicGrid
+    job = [np.array([1, 2, 3]), np.array([1., 2., 3.]), np.array([1., 2., 3.])]
+    with pytest.raises(ValueError):
+        process.calc_many(job)
+    with pytest.raises(ValueError):
+        process.calc_many([[[1, 2], [1, 2], [1]]])
+    with pytest.raises(ValueError):
+        process.calc_many([[[1, 2], [1, 2]]])
+
+    results_many = process.calc_many([job, job + [['a', 'b', 'c']]])
+    results = process.calc(*job)
+    for results_dask in results_many:
+        assert sorted(list(results)) == sorted(list(results_dask))
+        nptest.assert_equal(results_dask[list(results)[0]]['gpi'],
+                            np.array([1, 2, 3]))
+
+    # all jobs that calc can process are accepted, e.g. single points
+    # as scalars and metadata that is not one dimensional
+    valid_jobs = [(1, 1., 1.),
+                  (1, 1., 1., 'a'),
+                  ([1, 2], [1., 2.], [1., 2.], [('a', 'b'), ('c', 'd')]),
+                  ([1, 2], [1., 2.], [1., 2.], [('a', 'b'), ('c', 'd', 'e')])]
+    results_many = process.calc_many(valid_jobs)
+    for job, results_dask in zip(valid_jobs, results_many):
+        results = process.calc(*job)
+        assert sorted(list(results)) == sorted(list(results_dask))
+        for key in results:
+            for metric in results[key]:
+                nptest.assert_equal(results[key][metric],
+                                    results_dask[key][metric])
+
+
+def test_temporal_match_datasets_once_per_n():
+
+    datasets = setup_TestDatasets()
+    dm = DataManager(datasets, 'DS1', read_ts_names={d: 'read' for d in ['DS1', 'DS2', 'DS3']})
+
+    matcher = temporal_matchers.BasicTemporalMatching(window=1 / 24.0)
+    calls = []
+
+    def counting_matcher(df_dict, refkey, n=2):
+        calls.append(n)
+        return matcher.combinatory_matcher(df_dict, refkey, n=n)
+
+    process = Validation(
+        dm, 'DS1',
+        temporal_matcher=counting_matcher,
+        scaling=None,
+        metrics_calculators={
+            (3, 2): metrics_calculators.BasicMetrics(other_name='k1').calc_metrics,
+            (3, 3): metrics_calculators.BasicMetrics(other_name='k1').calc_metrics})
+
+    df_dict = dm.get_data(1, 1, 1)
+    matched_n = process.temporal_match_datasets(df_dict)
+    assert calls == [3]
+    assert matched_n[(3, 2)] is matched_n[(3, 3)]
+
+    # perform_validation and calc match once per n and gpi as well
+    matched_n, results, used_data = process.perform_validation(
+        dm.get_data(1, 1, 1), (1, 1, 1))
+    assert calls == [3, 3]
+    assert matched_n[(3, 2)] is matched_n[(3, 3)]
+    process.calc([1, 2], [1, 2], [1, 2])
+    assert calls == [3, 3, 3, 3]
+
+    # a subclass can change the temporal matching of the validation
+    class SubValidation(Validation):
+        def temporal_match_datasets(self, df_dict):
+            calls.append('sub')
+            return super(SubValidation, self).temporal_match_datasets(df_dict)
+
+    process = SubValidation(
+        dm, 'DS1',
+        temporal_matcher=counting_matcher,
+        scaling=None,
+        metrics_calculators={
+            (3, 2): metrics_calculators.BasicMetrics(other_name='k1').calc_metrics})
+    process.calc([1], [1], [1])
+    assert calls[4:] == ['sub', 3]
+
+
+def test_get_cached_column_positions():
+
+    columns = [('DS1', 'x'), ('DS3', 'y')]
+    df = pd.DataFrame(np.ones((2, 3)), columns=pd.MultiIndex.from_tuples(
+        [('DS1', 'x'), ('DS3', 'x'), ('DS3', 'y')]))
+    cache = {}
+    positions = get_cached_column_positions(df, columns, cache, 'key')
+    nptest.assert_equal(positions, [0, 2])
+    assert cache['key'] is positions
+    assert get_cached_column_positions(df, columns, cache, 'key') is positions
+
+    # the positions are looked up again if the columns changed
+    df = pd.DataFrame(np.ones((2, 2)), columns=pd.MultiIndex.from_tuples(
+        [('DS1', 'x'), ('DS3', 'y')]))
+    nptest.assert_equal(
+        get_cached_column_positions(df, columns, cache, 'key'), [0, 1])
+    nptest.assert_equal(cache['key'], [0, 1])
+
+    df = pd.DataFrame(np.ones((2, 1)), columns=pd.MultiIndex.from_tuples(
+        [('DS1', 'x')]))
+    with pytest.raises(KeyError):
+        get_cached_column_positions(df, columns, cache, 'key')
+
+
+def test_get_data_for_result_tuple():
+
+    datasets = setup_TestDatasets()
+    dm = DataManager(datasets, 'DS1', read_ts_names={d: 'read' for d in ['DS1', 'DS2', 'DS3']})
+    process = Validation(
+        dm, 'DS1',
+        scaling=None,
+        metrics_calculators={
+            (3, 2): metrics_calculators.BasicMetrics(other_name='k1').calc_metrics})
+
+    index = pd.date_range('2000-01-01', periods=3, freq='D')
+    columns_123 = pd.MultiIndex.from_tuples([('DS1', 'x'), ('DS2', 'y'), ('DS3', 'x')])
+    columns_124 = pd.MultiIndex.from_tuples([('DS1', 'x'), ('DS2', 'y'), ('DS4', 'x')])
+    n_matched_data = {
+        ('DS1', 'DS2', 'DS3'): pd.DataFrame(np.ones((3, 3)), index=index,
+                                            columns=columns_123),
+        ('DS1', 'DS2', 'DS4'): pd.DataFrame(np.zeros((3, 3)), index=index,
+                                            columns=columns_124)}
+
+    # the matched data containing all requested datasets has to be selected
+    data = process.get_data_for_result_tuple(n_matched_data,
+                                             (('DS1', 'x'), ('DS3', 'x')))
+    assert list(data.columns) == [('DS1', 'x'), ('DS3', 'x')]
+    nptest.assert_equal(data.values, np.ones((3, 2)))
+
+    # order of the datasets does not matter for exact matches
+    data = process.get_data_for_result_tuple(
+        n_matched_data, (('DS3', 'x'), ('DS1', 'x'), ('DS2', 'y')))
+    nptest.assert_equal(data.values, np.ones((3, 3)))
+
+    # no matched data for this combination
+    data = process.get_data_for_result_tuple(n_matched_data,
+                                             (('DS2', 'y'), ('DS5', 'x')))
+    assert len(data) == 0
+
+
 def test_args_to_iterable_non_iterables():
 
     gpis = 1